@@ -25,6 +25,25 @@ def get_jira():
     return jira
 
 
+def iter_issues(jira, jql: str, fields='*all', page_size: int = 100):
+    """
+    Yields the issues matching the jql query, fetching them page by page.
+    The query should be ordered (e.g. `ORDER BY key`) for the pages to be stable, and the
+    matching issues must not be modified while iterating since it would shift the pages.
+    """
+
+    start = 0
+    while True:
+        response = jira.jql(jql, fields=fields, start=start, limit=page_size)
+        issues = response['issues']
+        yield from issues
+
+        # Jira can return less results than requested, rely on the total instead of the page size
+        start += len(issues)
+        if not issues or start >= response['total']:
+            return
+
+
 def close_issue(jira, issue_key: str, verbose_test: str, dry_run: bool = False):
     print('Closing the issue', issue_key, 'for test', verbose_test)
 
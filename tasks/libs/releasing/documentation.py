@@ -1,31 +1,73 @@
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
+from functools import lru_cache
+from itertools import chain, dropwhile
+from xml.sax.saxutils import escape
+
+from invoke.exceptions import Exit
 
 from tasks.libs.owners.parsing import list_owners
 
-CONFLUENCE_DOMAIN = "https://datadoghq.atlassian.net/wiki"
+try:
+    from atlassian import Confluence, Jira
+    from lxml import html
+    from requests.exceptions import RequestException
+    from yattag import Doc
+except ImportError:
+    # These are only needed by the release tasks, fail hard if they get used.
+    pass
+
+JIRA_DOMAIN = "https://datadoghq.atlassian.net"
+CONFLUENCE_DOMAIN = f"{JIRA_DOMAIN}/wiki"
 SPACE_KEY = "agent"
 
-NON_RELEASING_TEAMS = {
-    'telemetry-and-analytics',
-    'documentation',
-    'single-machine-performance',
-    'agent-all',
-    'apm-core-reliability-and-performance',
-    'debugger',
-    'asm-go',
-    'agent-e2e-testing',
-    'serverless',
-    'agent-platform',
-    'agent-release-management',
-    'container-ecosystems',
-    'apm-trace-storage',
-    '@iglendd',  # Not a team but he's in the codeowners file
-    'sdlc-security',
-    'data-jobs-monitoring',
-    'serverless-aws',
-    'apm-ecosystems-performance',
-}
+NON_RELEASING_TEAMS = frozenset(
+    {
+        'telemetry-and-analytics',
+        'documentation',
+        'single-machine-performance',
+        'agent-all',
+        'apm-core-reliability-and-performance',
+        'debugger',
+        'asm-go',
+        'agent-e2e-testing',
+        'serverless',
+        'agent-platform',
+        'agent-release-management',
+        'container-ecosystems',
+        'apm-trace-storage',
+        '@iglendd',  # Not a team but he's in the codeowners file
+        'sdlc-security',
+        'data-jobs-monitoring',
+        'serverless-aws',
+        'apm-ecosystems-performance',
+    }
+)
+
+# Emails of the users already looked up, by account id
+_USERS_EMAILS = {}
+
+# Release milestones and their offset in days from the cut-off date
+MILESTONES = (
+    ('"Cut-off"', 0),
+    ('"RC.1 built"', 1),
+    ('"Staging deployment"', 4),
+    ('"Prod deployment start"', 11),
+    ('"Full prod deployment"', 18),
+    ('"Release"', 27),
+)
+
+COMMENTS_COLGROUP = '<colgroup><col style="width: 477.0px;"></col><col style="width: 743.0px;"></col></colgroup>'
+
+MAJOR_CHANGES_SECTION = (
+    '<h2>Major changes</h2>'
+    '<table data-table-width="760" data-layout="default">'
+    '<colgroup><col style="width: 760.0px;"></col></colgroup>'
+    '<tbody><tr><td><p></p></td></tr></tbody>'
+    '</table>'
+)
 
 
 def _stringify_config(config_dict):
@@ -47,8 +89,6 @@ def create_release_page(version, cutoff_date):
     password = os.environ['ATLASSIAN_PASSWORD']
     parent_page_id = "2244936127"
     # Make the POST request to create the page
-    from atlassian import Confluence
-
     confluence = Confluence(url=CONFLUENCE_DOMAIN, username=username, password=password)
     page_title = f"Agent {version}"
     teams = get_releasing_teams()
@@ -72,154 +112,135 @@ def create_release_page(version, cutoff_date):
 def get_release_page_info(version):
     username = os.environ['ATLASSIAN_USERNAME']
     password = os.environ['ATLASSIAN_PASSWORD']
-    from atlassian import Confluence
-
     c = Confluence(url=CONFLUENCE_DOMAIN, username=username, password=password)
     page = c.get_page_by_title(SPACE_KEY, f"Agent {version}", expand="body.storage")
     return f"{CONFLUENCE_DOMAIN}{page['_links']['webui']}", parse_table(page['body']['storage']['value'], missing=True)
 
 
 def parse_table(data, missing=True, teams=None):
-    from bs4 import BeautifulSoup
-
-    soup = BeautifulSoup(data, 'lxml')
-
-    # Find the table containing "Release managers"
-    table = soup.find('table')
-    rows = table.find_all('tr')
-    rm_start_row = next(row for row in rows if row.find_all('td')[0].text == 'Release managers')
-    start = rows.index(rm_start_row)
-    for row in rows[start:]:
-        cells = row.find_all('td')
-        users = cells[-1].find_all('ri:user')
-        if missing and len(cells) > 1 and len(users) == 0:
-            yield cells[-2].text
-        if teams is not None and cells[0].text.casefold() in teams and len(users) > 0:
-            yield users[0]['ri:account-id']
+    root = html.fromstring(data)
+    teams_cf = frozenset(team.casefold() for team in teams) if teams is not None else None
+
+    # Find the table containing "Release managers" and skip the rows preceding it
+    # iter() includes the root, which is the table itself when the body only contains it
+    table = next(root.iter('table'))
+    rows = dropwhile(lambda row: row.xpath('normalize-space(td[1])') != 'Release managers', table.iter('tr'))
+    rm_start_row = next(rows, None)
+    if rm_start_row is None:
+        raise Exit("Release managers row not found in the release page table", code=1)
+    for row in chain([rm_start_row], rows):
+        cells = row.findall('td')
+        # Only the first user of the row matters. The html parser keeps the `ri:` prefix as part of the tag and attribute names
+        user = next(cells[-1].iter('ri:user'), None)
+        if missing and user is None and len(cells) > 1:
+            yield cells[-2].text_content()
+        if teams_cf is not None and user is not None and cells[0].text_content().casefold() in teams_cf:
+            yield user.get('ri:account-id')
 
 
 def release_manager(version, team):
     username = os.environ['ATLASSIAN_USERNAME']
     password = os.environ['ATLASSIAN_PASSWORD']
 
-    from atlassian import Confluence
-
     # Disable the rc flag if any to get the release base name `x.y.z`
     version.rc = False
     c = Confluence(url=CONFLUENCE_DOMAIN, username=username, password=password)
     page = c.get_page_by_title(SPACE_KEY, f"Agent {version}", expand="body.storage")
-    account_ids = parse_table(page['body']['storage']['value'], missing=False, teams=[team])
+    account_ids = list(parse_table(page['body']['storage']['value'], missing=False, teams=[team]))
+    yield from get_users_emails(c, account_ids)
+
+
+def get_users_emails(confluence, account_ids):
+    """
+    Retrieves the emails of the given users. Emails are cached by account id for the
+    whole process since the same person can manage the release of several teams.
+    """
+    missing_ids = [id for id in dict.fromkeys(account_ids) if id not in _USERS_EMAILS]
+    if missing_ids:
+        _USERS_EMAILS.update(_fetch_users_emails(confluence, missing_ids))
     for id in account_ids:
-        user = c.get_user_details_by_accountid(id)
-        yield user['email']
+        yield _USERS_EMAILS[id]
 
 
+def _fetch_users_emails(confluence, account_ids):
+    """
+    Fetches the emails of the given users by account id with a single call to the bulk user endpoint,
+    falling back to concurrent calls per user if it fails.
+    """
+    try:
+        users = confluence.get(
+            f"{JIRA_DOMAIN}/rest/api/3/user/bulk",
+            # The endpoint returns 10 users per page by default
+            params=[("maxResults", len(account_ids))] + [("accountId", id) for id in account_ids],
+            absolute=True,
+        )
+        emails = {user['accountId']: user['emailAddress'] for user in users['values']}
+        return {id: emails[id] for id in account_ids}
+    except (RequestException, KeyError, TypeError) as e:
+        print(
+            f"Could not get the users from the bulk endpoint ({e!r}), falling back to one call per user",
+            file=sys.stderr,
+        )
+        with ThreadPoolExecutor(max_workers=min(16, len(account_ids))) as executor:
+            users = executor.map(confluence.get_user_details_by_accountid, account_ids)
+            return {id: user['email'] for id, user in zip(account_ids, users, strict=True)}
+
+
+@lru_cache(maxsize=1)
 def get_releasing_teams():
     owners = set(list_owners())
-    return sorted(owners - NON_RELEASING_TEAMS)
+    return tuple(sorted(owners - NON_RELEASING_TEAMS))
 
 
 def create_release_table(version, cutoff_date, teams):
-    from yattag import Doc
-
-    doc, tag, text, line = Doc().ttl()
-    line('h2', 'Summary')
-    with tag(
-        'table',
-        ('data-table-width', "760"),
-        ('data-layout', "default"),
-    ):
-        with tag('colgroup'):
-            for _ in range(3):
-                with tag('col', style="width: 226.67px;"):
-                    pass
-        with tag('tbody'):
-            with tag('tr'):
-                with tag('td'), tag('p'):
-                    text('Status')
-                with tag('td', colspan="2"), tag('p', style="text-align: center;"):
-                    with tag('ac:structured-macro', ('ac:name', "status"), ('ac:schema-version', "1")):
-                        with tag('ac:parameter', ('ac:name', "title")):
-                            text('Development')
-                        with tag('ac:parameter', ('ac:name', "colour")):
-                            text('Blue')
-            with tag('tr'):
-                with tag('td'), tag('p'):
-                    text('Release date')
-                with (
-                    tag('td', colspan="2"),
-                    tag('p', style="text-align: center;"),
-                    tag('time', datetime=f"{cutoff_date + timedelta(days=26)}"),
-                ):
-                    pass
-            with tag('tr'):
-                with tag('td'), tag('p'):
-                    text('Release notes')
-                with tag('td', colspan="2"), tag('p', style="text-align: center;"):
-                    with tag('a', href=f"https://github.com/DataDog/datadog-agent/releases/tag/{version}"):
-                        text(f'https://github.com/DataDog/datadog-agent/releases/tag/{version}')
-            with tag('tr'):
-                with tag('td'), tag('p'):
-                    text('Cut-off date')
-                with (
-                    tag('td', colspan="2"),
-                    tag('p', style="text-align: center;"),
-                    tag('time', datetime=f"{cutoff_date}"),
-                ):
-                    pass
-            with tag('tr'):
-                with tag('td'), tag('p'):
-                    text('Release coordinator')
-                with tag('td', colspan="2"), tag('p', style="text-align: center;"):
-                    with tag('ac:link'):
-                        with tag('ri:user', ('ri:account-id', "61142ccffc68c1006952fe23")):
-                            pass
-            with tag('tr'):
-                with tag('td', rowspan=str(len(teams))), tag('p'):
-                    text('Release managers')
-                    with tag('td'), tag('p'):
-                        text(teams[0])
-                    with tag('td'), tag('p', style="text-align: center;"):
-                        pass
-            for team in teams[1:]:
-                with tag('tr'):
-                    with tag('td'), tag('p'):
-                        text(team)
-                    with tag('td'), tag('p', style="text-align: center;"):
-                        pass
-
-    line('h2', 'Major changes')
-    with tag('table', ('data-table-width', "760"), ('data-layout', "default")):
-        with tag('colgroup'), tag('col', style="width: 760.0px;"):
-            pass
-        with tag('tbody'), tag('tr'), tag('td'), tag('p'):
-            pass
-    return doc.getvalue()
+    version = str(version)
+    # Unlike text nodes, attribute values also need their quotes escaped
+    href = escape(f'https://github.com/DataDog/datadog-agent/releases/tag/{version}', {'"': '&quot;'})
+    parts = [
+        '<h2>Summary</h2>',
+        '<table data-table-width="760" data-layout="default">',
+        '<colgroup>',
+        '<col style="width: 226.67px;"></col>' * 3,
+        '</colgroup>',
+        '<tbody>',
+        '<tr><td><p>Status</p></td><td colspan="2"><p style="text-align: center;">',
+        '<ac:structured-macro ac:name="status" ac:schema-version="1">',
+        '<ac:parameter ac:name="title">Development</ac:parameter>',
+        '<ac:parameter ac:name="colour">Blue</ac:parameter>',
+        '</ac:structured-macro></p></td></tr>',
+        '<tr><td><p>Release date</p></td><td colspan="2"><p style="text-align: center;">',
+        f'<time datetime="{cutoff_date + timedelta(days=26)}"></time></p></td></tr>',
+        '<tr><td><p>Release notes</p></td><td colspan="2"><p style="text-align: center;">',
+        f'<a href="{href}">',
+        f'https://github.com/DataDog/datadog-agent/releases/tag/{escape(version)}</a></p></td></tr>',
+        '<tr><td><p>Cut-off date</p></td><td colspan="2"><p style="text-align: center;">',
+        f'<time datetime="{cutoff_date}"></time></p></td></tr>',
+        '<tr><td><p>Release coordinator</p></td><td colspan="2"><p style="text-align: center;">',
+        '<ac:link><ri:user ri:account-id="61142ccffc68c1006952fe23"></ri:user></ac:link></p></td></tr>',
+        f'<tr><td rowspan="{len(teams)}"><p>Release managers',
+        f'<td><p>{escape(teams[0])}</p></td><td><p style="text-align: center;"></p></td>',
+        '</p></td></tr>',
+    ]
+    parts.extend(
+        f'<tr><td><p>{escape(team)}</p></td><td><p style="text-align: center;"></p></td></tr>' for team in teams[1:]
+    )
+    parts.append('</tbody></table>')
+    parts.append(MAJOR_CHANGES_SECTION)
+    return ''.join(parts)
 
 
 def create_release_notes(cutoff_date, teams):
-    from yattag import Doc
-
     doc, tag, text, line = Doc().ttl()
-    milestones = {
-        '"Cut-off"': cutoff_date,
-        '"RC.1 built"': cutoff_date + timedelta(days=1),
-        '"Staging deployment"': cutoff_date + timedelta(days=4),
-        '"Prod deployment start"': cutoff_date + timedelta(days=11),
-        '"Full prod deployment"': cutoff_date + timedelta(days=18),
-        '"Release"': cutoff_date + timedelta(days=27),
-    }
 
     line('h2', 'Schedule')
-    for i, item in enumerate(milestones.items()):
-        milestone, date = item
+    for i, (milestone, days) in enumerate(MILESTONES):
         with tag('p'):
             text(f'Milestone {i} - {milestone} - ')
-            with tag('time', datetime=str(date)):
+            with tag('time', datetime=str(cutoff_date + timedelta(days=days))):
                 pass
 
     line('h2', 'Timeline')
-    for i, milestone in enumerate(milestones.keys()):
+    for i, (milestone, _) in enumerate(MILESTONES):
         line('p', f'Milestone {i} - {milestone} - ')
 
     line('h2', 'Comments')
@@ -229,11 +250,7 @@ def create_release_notes(cutoff_date, teams):
         ('data-layout', "default"),
         ('ac:local-id', "a9ca104f-228e-4d8a-bb81-07f928682bb6"),
     ):
-        with tag('colgroup'):
-            with tag('col', style="width: 477.0px;"):
-                pass
-            with tag('col', style="width: 743.0px;"):
-                pass
+        doc.asis(COMMENTS_COLGROUP)
         with tag('tbody'):
             for team in teams:
                 with tag('tr'):
@@ -248,9 +265,8 @@ def create_release_notes(cutoff_date, teams):
 def list_not_closed_qa_cards(version):
     username = os.environ['ATLASSIAN_USERNAME']
     password = os.environ['ATLASSIAN_PASSWORD']
-    from atlassian import Jira
 
-    jira = Jira(url="https://datadoghq.atlassian.net", username=username, password=password)
+    jira = Jira(url=JIRA_DOMAIN, username=username, password=password)
     jql = f'labels in (ddqa) and labels not in (test_ignore) and labels in ({version}-qa)  and status not in ((Done, DONE, "Won\'t Fix", "WON\'T FIX", "In Progress", "Testing/Review", "In review", "✅ Done", "won\'t do", Duplicate, Closed, "NOT DOING", not-do, canceled, QA)) order by created desc'
     response = jira.jql(jql)
     return response['issues']
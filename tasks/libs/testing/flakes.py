@@ -13,7 +13,7 @@ def get_tests_family_if_failing_tests(test_name_list, failing_tests: set):
     """
     test_name_set = set(test_name_list)
     marked_tests_failing = failing_tests.intersection(test_name_set)
-    return get_tests_family(list(marked_tests_failing))
+    return get_tests_family(marked_tests_failing)
 
 
 def get_tests_family(test_name_list):
@@ -24,14 +24,16 @@ def get_tests_family(test_name_list):
     this method should return the set{"TestEKSSuite/TestCPU/TestCPUUtilization", "TestEKSSuite/TestCPU", "TestEKSSuite", "TestKindSuite/TestCPU", "TestKindSuite"}
 
     Args:
-        test_name_list (list): List of test names to get the parent tests from
+        test_name_list (iterable): Test names to get the parent tests from
 
     """
     test_family = set(test_name_list)
-    for test_name in test_name_list:
-        while test_name.count('/') > 0:
-            test_name = test_name.rsplit('/', 1)[0]
-            test_family.add(test_name)
+    for test_name in test_family.copy():
+        # Add every prefix ending before a '/' in a single left-to-right scan
+        separator = test_name.find('/')
+        while separator != -1:
+            test_family.add(test_name[:separator])
+            separator = test_name.find('/', separator + 1)
     return test_family
 
 
@@ -67,7 +69,7 @@ def consolidate_flaky_failures(flaky_failures: set, failing_tests: set) -> set:
     """
     new_flaky_failures = set(flaky_failures)
     list_failing_tests = list(failing_tests)
-    list_failing_tests.sort(key=lambda x: len(x.split('/')), reverse=True)
+    list_failing_tests.sort(key=lambda x: x.count('/'), reverse=True)
     for test in list_failing_tests:
         if test in flaky_failures:
             continue
@@ -120,11 +122,5 @@ def is_strict_child(parent, child):
 
     """
 
-    splitted_parent = parent.split('/')
-    splitted_child = child.split('/')
-    if len(splitted_parent) >= len(splitted_child):
-        return False
-    for i in range(len(splitted_parent)):
-        if splitted_parent[i] != splitted_child[i]:
-            return False
-    return True
+    # Equivalent to child.startswith(parent + '/') without building the prefix
+    return len(child) > len(parent) and child[len(parent)] == '/' and child.startswith(parent)
@@ -19,13 +19,21 @@ from tasks.libs.common.color import Color, color_message
 from tasks.libs.common.datadog_api import send_metrics
 from tasks.libs.common.utils import gitlab_section, is_conductor_scheduled_pipeline
 from tasks.libs.notify import alerts, failure_summary
-from tasks.libs.notify.jira_failing_tests import close_issue, get_failing_tests_names, get_jira
+from tasks.libs.notify.jira_failing_tests import close_issue, get_failing_tests_names, get_jira, iter_issues
 from tasks.libs.notify.utils import PROJECT_NAME, should_notify
 from tasks.libs.pipeline.notifications import (
     check_for_missing_owners_slack_and_jira,
 )
 from tasks.libs.pipeline.stats import compute_failed_jobs_series
 
+try:
+    # Use the libyaml bindings when available, they are much faster on large configurations
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+RE_TEST_NAME = re.compile(r'Test name: (.*)\n')
+
 
 @task
 def check_teams(_):
@@ -76,7 +84,8 @@ def check_consistent_failures(ctx, pipeline_id, job_failures_file="job_execution
     # The jobs dictionary contains the consecutive and cumulative failures for each job
     # The consecutive failures are reset to 0 when the job is not failing, and are raising an alert when reaching the CONSECUTIVE_THRESHOLD (3)
     # The cumulative failures list contains 1 for failures, 0 for succes. They contain only then CUMULATIVE_LENGTH(10) last executions and raise alert when 50% failure rate is reached
-    if not should_notify(pipeline_id) or os.environ.get('CI_COMMIT_BRANCH') != os.environ['CI_DEFAULT_BRANCH']:
+    # Check the branch first, should_notify requires a call to the Gitlab API
+    if os.environ.get('CI_COMMIT_BRANCH') != os.environ['CI_DEFAULT_BRANCH'] or not should_notify(pipeline_id):
         print("Consistent failures check is only run on the not-downstream default branch")
         return
 
@@ -110,9 +119,8 @@ def failure_summary_send_notifications(
     Make summaries from data in s3 and send them to slack
     """
 
-    assert (
-        daily_summary or weekly_summary and not (daily_summary and weekly_summary)
-    ), "Exactly one of daily or weekly summary must be set"
+    if daily_summary == weekly_summary:
+        raise Exit("Exactly one of --daily-summary or --weekly-summary must be set", code=1)
 
     if not (is_conductor_scheduled_pipeline()):
         print(
@@ -171,7 +179,7 @@ def gitlab_ci_diff(
     try:
         if from_diff:
             with open(from_diff) as f:
-                diff_data = yaml.safe_load(f)
+                diff_data = yaml.load(f, Loader=SafeLoader)
             diff = MultiGitlabCIDiff.from_dict(diff_data)
         else:
             _, _, diff = compute_gitlab_ci_config_diff(ctx, before, after)
@@ -236,13 +244,15 @@ def close_failing_tests_stale_issues(_, dry_run=False):
     This task is executed periodically.
     """
 
-    re_test_name = re.compile('Test name: (.*)\n')
-
     still_failing = get_failing_tests_names()
     jira = get_jira()
 
     print('Getting potential issues to close')
-    issues = jira.jql('status = "To Do" AND summary ~ "Failed agent CI test"')['issues']
+    # Only the comments are needed to know if an issue is stale. All the pages are fetched before
+    # closing anything since closed issues leave the result set and would shift the next pages.
+    issues = list(
+        iter_issues(jira, 'status = "To Do" AND summary ~ "Failed agent CI test" ORDER BY key', fields='comment')
+    )
 
     print(f'{len(issues)} failing test cards found')
 
@@ -258,9 +268,9 @@ def close_failing_tests_stale_issues(_, dry_run=False):
                 has_no_comments = False
                 break
 
-            test_name_match = re_test_name.findall(comment['body'])
+            test_name_match = RE_TEST_NAME.search(comment['body'])
             if test_name_match:
-                test_name = test_name_match[0]
+                test_name = test_name_match.group(1)
 
         if has_no_comments and test_name and test_name not in still_failing:
             try:
@@ -11,60 +11,51 @@ from tasks.libs.testing.flakes import (
 
 
 class TestGetTestParents(unittest.TestCase):
+    EKS_CPU_UTILIZATION_FAMILY = frozenset(
+        {
+            "TestEKSSuite",
+            "TestEKSSuite/TestCPU",
+            "TestEKSSuite/TestCPU/TestCPUUtilization",
+        }
+    )
+    KIND_CPU_FAMILY = frozenset({"TestKindSuite", "TestKindSuite/TestCPU"})
+
     def test_get_tests_parents(self):
         parents = get_tests_family(["TestEKSSuite/TestCPU/TestCPUUtilization", "TestKindSuite/TestKind"])
-        self.assertEqual(
+        self.assertSetEqual(
             parents,
-            {
-                "TestEKSSuite",
-                "TestEKSSuite/TestCPU",
-                "TestEKSSuite/TestCPU/TestCPUUtilization",
-                "TestKindSuite",
-                "TestKindSuite/TestKind",
-            },
+            self.EKS_CPU_UTILIZATION_FAMILY | {"TestKindSuite", "TestKindSuite/TestKind"},
         )
 
+    def test_get_tests_parents_shared_parents(self):
+        tests = [f"TestEKSSuite/TestCPU/TestCPUUtilization/Sub{i}" for i in range(100)]
+        parents = get_tests_family(tests + tests)
+        self.assertSetEqual(parents, self.EKS_CPU_UTILIZATION_FAMILY | set(tests))
+
+    def test_get_tests_parents_iterable(self):
+        parents = get_tests_family(name for name in ["TestKindSuite/TestCPU"])
+        self.assertSetEqual(parents, self.KIND_CPU_FAMILY)
+
     def test_get_test_parents_empty(self):
         parents = get_tests_family([])
-        self.assertEqual(
-            parents,
-            set(),
-        )
+        self.assertSetEqual(parents, frozenset())
 
     def test_get_test_parents_failing_no_failing_tests(self):
         parents = get_tests_family_if_failing_tests(["TestEKSSuite/TestCPU/TestCPUUtilization"], set())
-        self.assertEqual(
-            parents,
-            set(),
-        )
+        self.assertSetEqual(parents, frozenset())
 
     def test_get_test_parents_failing_all_failing_tests(self):
         parents = get_tests_family_if_failing_tests(
             ["TestEKSSuite/TestCPU/TestCPUUtilization", "TestKindSuite/TestCPU"],
             {"TestKindSuite/TestCPU", "TestEKSSuite/TestCPU/TestCPUUtilization"},
         )
-        self.assertEqual(
-            parents,
-            {
-                "TestEKSSuite",
-                "TestEKSSuite/TestCPU",
-                "TestEKSSuite/TestCPU/TestCPUUtilization",
-                "TestKindSuite",
-                "TestKindSuite/TestCPU",
-            },
-        )
+        self.assertSetEqual(parents, self.EKS_CPU_UTILIZATION_FAMILY | self.KIND_CPU_FAMILY)
 
     def test_get_test_parents_failing_some_failing_tests(self):
         parents = get_tests_family_if_failing_tests(
             ["TestEKSSuite/TestCPU/TestCPUUtilization", "TestKindSuite/TestCPU"], {"TestKindSuite/TestCPU"}
         )
-        self.assertEqual(
-            parents,
-            {
-                "TestKindSuite",
-                "TestKindSuite/TestCPU",
-            },
-        )
+        self.assertSetEqual(parents, self.KIND_CPU_FAMILY)
 
 
 class TestIsKnownFlake(unittest.TestCase):
@@ -104,64 +95,41 @@ class TestIsKnownFlake(unittest.TestCase):
 
 
 class TestConsolidateFlakeFailures(unittest.TestCase):
+    MARIO_LUIGI_FAMILY = frozenset(
+        {
+            "TestEKSSuite/Mario",
+            "TestEKSSuite/Mario/Luigi",
+            "TestEKSSuite/Mario/Luigi/Wario",
+            "TestEKSSuite/Mario/Luigi/Waluigi",
+        }
+    )
+    WARIO_WALUIGI = frozenset({"TestEKSSuite/Mario/Luigi/Wario", "TestEKSSuite/Mario/Luigi/Waluigi"})
+
     def test_one_known_flaky_failure(self):
         flaky_failures = consolidate_flaky_failures({"TestEKSSuite/Mario"}, {"TestEKSSuite/Mario"})
-        self.assertEqual(
-            flaky_failures,
-            {"TestEKSSuite/Mario"},
-        )
+        self.assertSetEqual(flaky_failures, {"TestEKSSuite/Mario"})
 
     def test_one_failure_parent_of_flaky_failure(self):
         flaky_failures = consolidate_flaky_failures({"TestEKSSuite/Mario"}, {"TestEKSSuite", "TestEKSSuite/Mario"})
-        self.assertEqual(
-            flaky_failures,
-            {"TestEKSSuite/Mario", "TestEKSSuite"},
-        )
+        self.assertSetEqual(flaky_failures, {"TestEKSSuite/Mario", "TestEKSSuite"})
 
     def test_one_failure_parent_of_non_flaky_failure(self):
         flaky_failures = consolidate_flaky_failures({"TestEKSSuite/Mario"}, {"TestEKSSuite", "TestEKSSuite/Luigi"})
-        self.assertEqual(
-            flaky_failures,
-            {"TestEKSSuite/Mario"},
-        )
+        self.assertSetEqual(flaky_failures, {"TestEKSSuite/Mario"})
 
     def test_recursively_flaky_failures(self):
         flaky_failures = consolidate_flaky_failures(
-            {"TestEKSSuite/Mario/Luigi/Wario", "TestEKSSuite/Mario/Luigi/Waluigi"},
-            {
-                "TestEKSSuite/Mario",
-                "TestEKSSuite/Mario/Luigi",
-                "TestEKSSuite/Mario/Luigi/Wario",
-                "TestEKSSuite/Mario/Luigi/Waluigi",
-                "TestKindSuite/Mario",
-            },
-        )
-        self.assertEqual(
-            flaky_failures,
-            {
-                "TestEKSSuite/Mario",
-                "TestEKSSuite/Mario/Luigi",
-                "TestEKSSuite/Mario/Luigi/Wario",
-                "TestEKSSuite/Mario/Luigi/Waluigi",
-            },
+            self.WARIO_WALUIGI,
+            self.MARIO_LUIGI_FAMILY | {"TestKindSuite/Mario"},
         )
+        self.assertSetEqual(flaky_failures, self.MARIO_LUIGI_FAMILY)
 
     def test_recursively_one__non_flaky_failures(self):
         flaky_failures = consolidate_flaky_failures(
-            {"TestEKSSuite/Mario/Luigi/Wario", "TestEKSSuite/Mario/Luigi/Waluigi"},
-            {
-                "TestEKSSuite/Mario",
-                "TestEKSSuite/Mario/Luigi",
-                "TestEKSSuite/Mario/Luigi/Wario",
-                "TestEKSSuite/Mario/Luigi/Waluigi",
-                "TestEKSSuite/Mario/Luigi/Yoshi",
-                "TestKindSuite/Mario",
-            },
-        )
-        self.assertEqual(
-            flaky_failures,
-            {"TestEKSSuite/Mario/Luigi/Wario", "TestEKSSuite/Mario/Luigi/Waluigi"},
+            self.WARIO_WALUIGI,
+            self.MARIO_LUIGI_FAMILY | {"TestEKSSuite/Mario/Luigi/Yoshi", "TestKindSuite/Mario"},
         )
+        self.assertSetEqual(flaky_failures, self.WARIO_WALUIGI)
 
 
 class TestIsChild(unittest.TestCase):
@@ -173,6 +141,11 @@ class TestIsChild(unittest.TestCase):
         self.assertFalse(is_strict_child("TestEKSSuite", "TestKindSuite/TestCPU/TestToto/TestNario"))
         self.assertFalse(is_strict_child("TestEKSSuite/TestCPU", "TestKindSuite/TestCPU/TestCPUUtilization"))
 
+    def test_is_not_child_same_prefix(self):
+        self.assertFalse(is_strict_child("TestEKSSuite", "TestEKSSuiteVM/TestCPU"))
+        self.assertFalse(is_strict_child("TestEKSSuite", "TestEKSSuite"))
+        self.assertFalse(is_strict_child("TestEKSSuite/TestCPU", "TestEKSSuite"))
+
 
 class TestChildInList(unittest.TestCase):
     def test_child_in_list(self):
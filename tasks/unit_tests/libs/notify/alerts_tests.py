@@ -76,6 +76,7 @@ class TestCheckConsistentFailures(unittest.TestCase):
                 MockContext(run=Result("test")),
                 path,
             )
+        repo_mock.pipelines.get.assert_not_called()
         repo_mock.jobs.get.assert_not_called()
 
 
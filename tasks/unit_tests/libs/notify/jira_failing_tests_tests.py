@@ -0,0 +1,45 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, call
+
+from tasks.libs.notify.jira_failing_tests import iter_issues
+
+
+class TestIterIssues(TestCase):
+    def test_single_page(self):
+        jira = MagicMock()
+        jira.jql.return_value = {'issues': [{'key': 'A-1'}, {'key': 'A-2'}], 'total': 2}
+
+        issues = list(iter_issues(jira, 'project = A', page_size=3))
+
+        self.assertListEqual([issue['key'] for issue in issues], ['A-1', 'A-2'])
+        jira.jql.assert_called_once_with('project = A', fields='*all', start=0, limit=3)
+
+    def test_multiple_pages(self):
+        jira = MagicMock()
+        jira.jql.side_effect = [
+            {'issues': [{'key': 'A-1'}, {'key': 'A-2'}], 'total': 4},
+            {'issues': [{'key': 'A-3'}, {'key': 'A-4'}], 'total': 4},
+        ]
+
+        issues = list(iter_issues(jira, 'project = A', fields='comment', page_size=2))
+
+        self.assertListEqual([issue['key'] for issue in issues], ['A-1', 'A-2', 'A-3', 'A-4'])
+        self.assertListEqual(
+            jira.jql.call_args_list,
+            [
+                call('project = A', fields='comment', start=0, limit=2),
+                call('project = A', fields='comment', start=2, limit=2),
+            ],
+        )
+
+    def test_pages_smaller_than_requested(self):
+        jira = MagicMock()
+        jira.jql.side_effect = [
+            {'issues': [{'key': 'A-1'}, {'key': 'A-2'}], 'total': 3},
+            {'issues': [{'key': 'A-3'}], 'total': 3},
+        ]
+
+        issues = list(iter_issues(jira, 'project = A', page_size=100))
+
+        self.assertListEqual([issue['key'] for issue in issues], ['A-1', 'A-2', 'A-3'])
+        self.assertEqual(jira.jql.call_args_list[1], call('project = A', fields='*all', start=2, limit=100))
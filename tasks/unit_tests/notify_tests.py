@@ -7,6 +7,7 @@ from unittest.mock import MagicMock, patch
 
 from gitlab.v4.objects import ProjectJob
 from invoke import MockContext
+from invoke.exceptions import Exit
 
 from tasks import notify
 from tasks.libs.pipeline.notifications import load_and_validate
@@ -96,3 +97,49 @@ class TestFailureSummarySendNotifications(unittest.TestCase):
     def test_sheduled_conductor_dst(self, print_mock):
         notify.failure_summary_send_notifications(MockContext(), daily_summary=True)
         print_mock.assert_not_called()
+
+    def test_no_summary(self):
+        with self.assertRaises(Exit):
+            notify.failure_summary_send_notifications(MockContext())
+
+    def test_both_summaries(self):
+        with self.assertRaises(Exit):
+            notify.failure_summary_send_notifications(MockContext(), daily_summary=True, weekly_summary=True)
+
+
+class FakeJira:
+    """Jira whose searches only return the issues that are still to do"""
+
+    def __init__(self, n_issues):
+        self.todo = [
+            {
+                'key': f'CI-{i}',
+                'fields': {
+                    'comment': {
+                        'comments': [{'author': {'displayName': 'Robot'}, 'body': f'Test name: TestSuite/Test{i}\n'}]
+                    }
+                },
+            }
+            for i in range(n_issues)
+        ]
+
+    def jql(self, jql, fields, start, limit):
+        return {'issues': self.todo[start : start + limit], 'total': len(self.todo)}
+
+    def close(self, jira, issue_key, test_name, dry_run):
+        self.todo = [issue for issue in self.todo if issue['key'] != issue_key]
+
+
+class TestCloseFailingTestsStaleIssues(unittest.TestCase):
+    @patch('tasks.notify.get_failing_tests_names', new=MagicMock(return_value={'TestSuite/Test150'}))
+    @patch('builtins.print', new=MagicMock())
+    def test_close_all_pages(self):
+        jira = FakeJira(250)
+        with (
+            patch('tasks.notify.get_jira', new=MagicMock(return_value=jira)),
+            patch('tasks.notify.close_issue', side_effect=jira.close) as close_mock,
+        ):
+            notify.close_failing_tests_stale_issues(MockContext())
+
+        self.assertEqual(close_mock.call_count, 249)
+        self.assertListEqual([issue['key'] for issue in jira.todo], ['CI-150'])
@@ -6,15 +6,17 @@ import sys
 import unittest
 from collections import OrderedDict
 from contextlib import contextmanager
+from datetime import date
 from types import SimpleNamespace
 from unittest.mock import ANY, MagicMock, call, patch
 
 from invoke import Context, MockContext, Result
 from invoke.exceptions import Exit
+from requests.exceptions import HTTPError
 
 from tasks import release
 from tasks.libs.common.gomodules import GoModule
-from tasks.libs.releasing.documentation import parse_table
+from tasks.libs.releasing.documentation import create_release_table, get_users_emails, parse_table
 from tasks.libs.releasing.json import (
     COMPATIBLE_MAJOR_VERSIONS,
     _get_jmxfetch_release_json_info,
@@ -352,6 +354,128 @@ class TestParseTable(unittest.TestCase):
         user = list(parse_table(self.html, missing=False, teams=['agent-integrations']))
         self.assertListEqual(['5d4b47740fa6d40d14fc7af0'], user)
 
+    def test_table_only(self):
+        html = (
+            '<table><tbody>'
+            '<tr><td><p>Status</p></td><td colspan="2"><p>QA</p></td></tr>'
+            '<tr><td rowspan="3"><p>Release managers</p></td><td><p>apm</p></td><td><p> </p></td></tr>'
+            '<tr><td><p>ebpf</p></td><td><p> </p></td></tr>'
+            '<tr><td><p>windows-agent</p></td><td><p><ac:link><ri:user ri:account-id="5d4aeea52be2120ce3e5f41a" /></ac:link></p></td></tr>'
+            '</tbody></table>'
+        )
+        self.assertListEqual(['apm', 'ebpf'], list(parse_table(html, missing=True)))
+        self.assertListEqual(
+            ['5d4aeea52be2120ce3e5f41a'], list(parse_table(html, missing=False, teams=['windows-agent']))
+        )
+
+    def test_no_release_managers_row(self):
+        html = (
+            '<table><tbody>'
+            '<tr><td><p>Status</p></td><td colspan="2"><p>QA</p></td></tr>'
+            '<tr><td rowspan="2"><p>Release owners</p></td><td><p>apm</p></td><td><p> </p></td></tr>'
+            '<tr><td><p>ebpf</p></td><td><p> </p></td></tr>'
+            '</tbody></table>'
+        )
+        with self.assertRaises(Exit):
+            list(parse_table(html, missing=True))
+        with self.assertRaises(Exit):
+            list(parse_table(html, missing=False, teams=['apm']))
+
+    def test_find_rm_several_teams(self):
+        users = list(parse_table(self.html, missing=False, teams=['Agent-Integrations', 'apm']))
+        self.assertListEqual(['5d4b47740fa6d40d14fc7af0', '5d91f278ede9300dd30ba76c'], users)
+
+
+class TestCreateReleaseTable(unittest.TestCase):
+    def test_render(self):
+        table = create_release_table("7.60.0", date(2024, 10, 1), ["agent-a", "R&D <team>", "apm"])
+        self.assertEqual(
+            table,
+            '<h2>Summary</h2>'
+            '<table data-table-width="760" data-layout="default">'
+            '<colgroup>'
+            '<col style="width: 226.67px;"></col><col style="width: 226.67px;"></col><col style="width: 226.67px;"></col>'
+            '</colgroup>'
+            '<tbody>'
+            '<tr><td><p>Status</p></td><td colspan="2"><p style="text-align: center;">'
+            '<ac:structured-macro ac:name="status" ac:schema-version="1">'
+            '<ac:parameter ac:name="title">Development</ac:parameter>'
+            '<ac:parameter ac:name="colour">Blue</ac:parameter>'
+            '</ac:structured-macro></p></td></tr>'
+            '<tr><td><p>Release date</p></td><td colspan="2"><p style="text-align: center;">'
+            '<time datetime="2024-10-27"></time></p></td></tr>'
+            '<tr><td><p>Release notes</p></td><td colspan="2"><p style="text-align: center;">'
+            '<a href="https://github.com/DataDog/datadog-agent/releases/tag/7.60.0">'
+            'https://github.com/DataDog/datadog-agent/releases/tag/7.60.0</a></p></td></tr>'
+            '<tr><td><p>Cut-off date</p></td><td colspan="2"><p style="text-align: center;">'
+            '<time datetime="2024-10-01"></time></p></td></tr>'
+            '<tr><td><p>Release coordinator</p></td><td colspan="2"><p style="text-align: center;">'
+            '<ac:link><ri:user ri:account-id="61142ccffc68c1006952fe23"></ri:user></ac:link></p></td></tr>'
+            '<tr><td rowspan="3"><p>Release managers'
+            '<td><p>agent-a</p></td><td><p style="text-align: center;"></p></td>'
+            '</p></td></tr>'
+            '<tr><td><p>R&amp;D &lt;team&gt;</p></td><td><p style="text-align: center;"></p></td></tr>'
+            '<tr><td><p>apm</p></td><td><p style="text-align: center;"></p></td></tr>'
+            '</tbody></table>'
+            '<h2>Major changes</h2>'
+            '<table data-table-width="760" data-layout="default">'
+            '<colgroup><col style="width: 760.0px;"></col></colgroup>'
+            '<tbody><tr><td><p></p></td></tr></tbody>'
+            '</table>',
+        )
+
+    def test_escape_href(self):
+        table = create_release_table('7.60.0"&', date(2024, 10, 1), ["apm"])
+        self.assertIn('<a href="https://github.com/DataDog/datadog-agent/releases/tag/7.60.0&quot;&amp;">', table)
+        self.assertIn('https://github.com/DataDog/datadog-agent/releases/tag/7.60.0"&amp;</a>', table)
+
+
+@patch.dict('tasks.libs.releasing.documentation._USERS_EMAILS', clear=True)
+class TestGetUsersEmails(unittest.TestCase):
+    def test_bulk(self):
+        confluence = MagicMock()
+        confluence.get.return_value = {
+            'values': [
+                {'accountId': 'b', 'emailAddress': 'b@dd.com'},
+                {'accountId': 'a', 'emailAddress': 'a@dd.com'},
+            ]
+        }
+        emails = list(get_users_emails(confluence, ['a', 'b']))
+        self.assertListEqual(['a@dd.com', 'b@dd.com'], emails)
+        confluence.get.assert_called_once_with(
+            'https://datadoghq.atlassian.net/rest/api/3/user/bulk',
+            params=[('maxResults', 2), ('accountId', 'a'), ('accountId', 'b')],
+            absolute=True,
+        )
+        confluence.get_user_details_by_accountid.assert_not_called()
+
+    @patch('builtins.print')
+    def test_fallback(self, print_mock):
+        confluence = MagicMock()
+        confluence.get.side_effect = HTTPError("404 Not Found")
+        confluence.get_user_details_by_accountid.side_effect = lambda id: {'email': f'{id}@dd.com'}
+        emails = list(get_users_emails(confluence, ['a', 'b']))
+        self.assertListEqual(['a@dd.com', 'b@dd.com'], emails)
+        self.assertEqual(confluence.get_user_details_by_accountid.call_count, 2)
+        print_mock.assert_called_once()
+
+    @patch('builtins.print', new=MagicMock())
+    def test_cached(self):
+        confluence = MagicMock()
+        confluence.get.side_effect = HTTPError("404 Not Found")
+        confluence.get_user_details_by_accountid.side_effect = lambda id: {'email': f'{id}@dd.com'}
+        self.assertListEqual(['a@dd.com', 'a@dd.com'], list(get_users_emails(confluence, ['a', 'a'])))
+        self.assertListEqual(['a@dd.com', 'b@dd.com'], list(get_users_emails(confluence, ['a', 'b'])))
+        self.assertListEqual(
+            confluence.get_user_details_by_accountid.call_args_list,
+            [call('a'), call('b')],
+        )
+
+    def test_no_users(self):
+        confluence = MagicMock()
+        self.assertListEqual([], list(get_users_emails(confluence, [])))
+        confluence.get.assert_not_called()
+
 
 class TestFindPreviousTags(unittest.TestCase):
     keys = ["HARRY_POTTER_VERSION", "HERMIONE_GRANGER_VERSION", "WEASLEY_VERSION"]